@@ -307,6 +307,40 @@ def benchmark_function_utilities():
     print()
 
 
+def benchmark_memoize_overhead():
+    """测试 memoize 缓存命中开销."""
+    print("🔑 memoize 缓存命中开销测试")
+    print("=" * 50)
+
+    def legacy_key(args, kwargs):
+        # 旧实现: 每次调用都排序 kwargs, 且不支持不可哈希参数
+        return (args, tuple(sorted(kwargs.items())))
+
+    def target(a, b=1, *, c=0):
+        return a
+
+    build_key = function._make_key_builder(target)
+    cases = [
+        ("位置参数 f(1, 2)", (1, 2), {}),
+        ("关键字参数 f(1, b=2, c=3)", (1,), {"b": 2, "c": 3}),
+    ]
+
+    for name, args, kwargs in cases:
+        before = benchmark(legacy_key, args, kwargs, iterations=100000)
+        after = benchmark(build_key, args, kwargs, iterations=100000)
+        print(f"  构建缓存键 {name}:")
+        print(f"    之前: {format_time(before['avg_time'])}")
+        print(f"    之后: {format_time(after['avg_time'])}")
+        print()
+
+    memoized = function.memoize(target)
+    memoized(1, 2)
+    memoized([1, 2, 3])
+    for name, args in [("位置参数", (1, 2)), ("列表参数", ([1, 2, 3],))]:
+        result = benchmark(memoized, *args, iterations=100000)
+        print_benchmark_result(f"memoize 命中 ({name})", result)
+
+
 async def benchmark_async_functions():
     """测试异步函数性能."""
     print("⚡ 异步函数性能测试")
@@ -355,6 +389,36 @@ async def benchmark_async_functions():
     print()
 
 
+async def benchmark_gather_modes(sizes: tuple[int, ...] = (100_000, 1_000_000)):
+    """对比 gather_with_concurrency 的信号量模式与工作池模式."""
+    print("🧵 gather_with_concurrency 模式对比")
+    print("=" * 50)
+
+    peak_tasks = 0
+
+    async def job(i):
+        nonlocal peak_tasks
+        if i % 10_000 == 0:
+            peak_tasks = max(peak_tasks, len(asyncio.all_tasks()))
+        await asyncio.sleep(0)
+        return i
+
+    for size in sizes:
+        for mode in ("semaphore", "workers"):
+            peak_tasks = 0
+            coroutines = [job(i) for i in range(size)]
+            start_time = time.perf_counter()
+            await async_utils.gather_with_concurrency(*coroutines, limit=100, mode=mode)
+            total_time = time.perf_counter() - start_time
+            del coroutines
+
+            print(f"  {mode} ({size:,} 个, limit=100):")
+            print(f"    总时间: {format_time(total_time)}")
+            print(f"    平均每项: {format_time(total_time / size)}")
+            print(f"    峰值任务数: {peak_tasks:,}")
+            print()
+
+
 def main():
     """主函数."""
     print("🚀 pyutils 性能基准测试")
@@ -371,10 +435,12 @@ def main():
         benchmark_math_functions()
         benchmark_object_functions()
         benchmark_function_utilities()
+        benchmark_memoize_overhead()
 
         # 异步函数测试
         print("开始异步函数性能测试...")
         asyncio.run(benchmark_async_functions())
+        asyncio.run(benchmark_gather_modes())
 
         print("✅ 所有性能测试完成!")
         print("\n📊 测试总结:")
@@ -43,13 +43,21 @@ from .array import (
     zip_object,
 )
 from .async_utils import (
+    afilter,
+    amap,
     delay,
+    every_async,
     filter_async,
+    find_async,
     map_async,
+    map_sync,
     race,
     retry_async,
+    run_in_process,
     run_in_thread,
+    run_sync,
     sleep_async,
+    some_async,
     timeout,
 )
 from .bytes import (
@@ -195,7 +203,9 @@ __all__ = [
     "add_days",
     "add_hours",
     "add_minutes",
+    "afilter",
     "alphabetical",
+    "amap",
     "array",
     "async_utils",
     "at",
@@ -228,10 +238,12 @@ __all__ = [
     "entries",
     "escape_html",
     "every",
+    "every_async",
     "factorial",
     "fibonacci",
     "fill",
     "filter_async",
+    "find_async",
     "find_index",
     "find_last_index",
     "first",
@@ -282,6 +294,7 @@ __all__ = [
     "lcm",
     "lerp",
     "map_async",
+    "map_sync",
     "math",
     "memoize",
     "merge",
@@ -302,7 +315,9 @@ __all__ = [
     "range_iter",
     "range_list",
     "retry_async",
+    "run_in_process",
     "run_in_thread",
+    "run_sync",
     "safe_json_stringify",
     "set_nested_value",
     "shuffle",
@@ -310,6 +325,7 @@ __all__ = [
     "slugify",
     "snake_case",
     "some",
+    "some_async",
     "splice",
     "string",
     "throttle",
@@ -3,26 +3,50 @@
 """Tests for async_utils module."""
 
 import asyncio
+import os
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 import pytest
 
+from pyutils import async_utils
 from pyutils.async_utils import (
+    AdaptiveBatchSizer,
     AsyncTimer,
+    BackgroundLoop,
+    BatchLoader,
+    Hedger,
+    LoopMonitor,
+    Pipeline,
+    afilter,
+    amap,
     batch_process,
     delay,
+    every_async,
     filter_async,
+    find_async,
     gather_with_concurrency,
+    get_executor,
+    hedge,
     map_async,
+    map_sync,
     race,
+    register_executor,
     retry_async,
+    run_in_executor,
+    run_in_process,
     run_in_thread,
+    run_sync,
+    shutdown_executors,
     sleep_async,
+    some_async,
     timeout,
     wait_for_all,
     wait_for_any,
     with_timeout_default,
 )
+from pyutils.function import RetryBudget
 
 
 class TestSleepAsync:
@@ -160,6 +184,51 @@ class TestGatherWithConcurrency:
         results = await gather_with_concurrency(limit=2)
         assert results == []
 
+    @pytest.mark.asyncio
+    async def test_workers_mode_limits_live_tasks(self):
+        """Test worker mode keeps results ordered with only limit tasks."""
+        peak_tasks = 0
+
+        async def task(value):
+            nonlocal peak_tasks
+            peak_tasks = max(peak_tasks, len(asyncio.all_tasks()))
+            await asyncio.sleep(0.001 * (value % 3))
+            return value
+
+        results = await gather_with_concurrency(
+            *[task(i) for i in range(100)], limit=4, mode="workers"
+        )
+
+        assert results == list(range(100))
+        # The test task itself plus four workers
+        assert peak_tasks <= 5
+
+    @pytest.mark.asyncio
+    async def test_workers_mode_error_closes_pending(self):
+        """Test a failure cancels workers and closes unstarted coroutines."""
+        started = []
+
+        async def task(value):
+            started.append(value)
+            if value == 1:
+                raise ValueError("boom")
+            await asyncio.sleep(0.01)
+
+        coroutines = [task(i) for i in range(10)]
+        with pytest.raises(ValueError):
+            await gather_with_concurrency(*coroutines, limit=2, mode="workers")
+
+        assert started == [0, 1]
+        assert all(coro.cr_frame is None for coro in coroutines)
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments(self):
+        """Test invalid limit and mode are rejected."""
+        with pytest.raises(ValueError):
+            await gather_with_concurrency(limit=0)
+        with pytest.raises(ValueError, match="Unknown mode"):
+            await gather_with_concurrency(limit=1, mode="pool")
+
 
 class TestRace:
     """Test race function."""
@@ -205,6 +274,132 @@ class TestRace:
         assert result == "only_one"
 
 
+class TestHedge:
+    """Test Hedger and hedge."""
+
+    @pytest.mark.asyncio
+    async def test_fast_call_not_hedged(self):
+        """Test no backup starts when the first attempt is fast."""
+        hedger = Hedger(delay=0.05)
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return "ok"
+
+        assert await hedger.run(fetch) == "ok"
+        assert calls == 1
+        assert hedger.stats()["hedges"] == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_call_hedged_and_loser_cancelled(self):
+        """Test a backup wins over a stuck first attempt."""
+        hedger = Hedger(delay=0.01)
+        attempts = []
+        cancelled = []
+
+        async def fetch():
+            attempt = len(attempts)
+            attempts.append(attempt)
+            try:
+                await asyncio.sleep(10 if attempt == 0 else 0)
+            except asyncio.CancelledError:
+                cancelled.append(attempt)
+                raise
+            return attempt
+
+        assert await hedger.run(fetch) == 1
+        await asyncio.sleep(0)
+        assert cancelled == [0]
+        stats = hedger.stats()
+        assert stats["hedges"] == 1
+        assert stats["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_drain_losers(self):
+        """Test losers keep running when cancel_losers is False."""
+        hedger = Hedger(delay=0.01, cancel_losers=False)
+        finished = []
+
+        async def fetch():
+            attempt = len(finished) + hedger.hedges
+            await asyncio.sleep(0.05 if hedger.hedges == 0 else 0)
+            finished.append(attempt)
+            return "ok"
+
+        assert await hedger.run(fetch) == "ok"
+        await asyncio.sleep(0.06)
+        assert len(finished) == 2
+
+    @pytest.mark.asyncio
+    async def test_budget_caps_hedges(self):
+        """Test the budget stops hedging when it runs out."""
+        hedger = Hedger(delay=0.001, budget=RetryBudget(ratio=0.1, min_tokens=1))
+
+        async def fetch():
+            await asyncio.sleep(0.005)
+            return "ok"
+
+        for _ in range(5):
+            assert await hedger.run(fetch) == "ok"
+        assert hedger.stats()["hedges"] == 1
+        assert hedger.budget.info()["suppressed"] == 4
+
+    @pytest.mark.asyncio
+    async def test_percentile_delay(self):
+        """Test the delay follows observed latency once warmed up."""
+        hedger = Hedger(delay="p50", min_samples=5, initial_delay=1.0)
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        assert hedger.delay == 1.0
+        for _ in range(5):
+            await hedger.run(fetch)
+        assert 0.009 <= hedger.delay < 0.5
+
+    @pytest.mark.asyncio
+    async def test_all_attempts_fail(self):
+        """Test the error is raised when every attempt fails."""
+
+        async def fetch():
+            raise ValueError("down")
+
+        with pytest.raises(ValueError):
+            await hedge(fetch, delay=0.01)
+
+    @pytest.mark.asyncio
+    async def test_hedge_with_lambdas(self):
+        """Test hedge accepts a new lambda on every call."""
+
+        async def fetch(x):
+            return x
+
+        for i in range(3):
+            assert await hedge(lambda i=i: fetch(i), delay="p99") == i
+
+    @pytest.mark.asyncio
+    async def test_default_hedgers_are_bounded(self):
+        """Test callables without __code__ do not grow the call-site map."""
+
+        class Fetch:
+            async def __call__(self):
+                return 1
+
+        for _ in range(async_utils._MAX_DEFAULT_HEDGERS + 10):
+            assert await hedge(Fetch(), delay=1.0) == 1
+
+        assert len(async_utils._default_hedgers) == async_utils._MAX_DEFAULT_HEDGERS
+
+    def test_invalid_delay(self):
+        """Test invalid delays are rejected."""
+        for value in ("95", "pxx", "p0", -1):
+            with pytest.raises(ValueError):
+                Hedger(delay=value)
+
+
 class TestRetryAsync:
     """Test retry_async function."""
 
@@ -281,6 +476,84 @@ class TestRetryAsync:
         assert call_count == 2
 
 
+class TestRetryAsyncBackoff:
+    """Test retry_async jitter, deadline and budget options."""
+
+    @pytest.mark.asyncio
+    async def test_retry_async_max_delay_and_jitter(self):
+        """Test capped, jittered delays still retry to success."""
+        call_count = 0
+
+        async def flaky():
+            nonlocal call_count
+            call_count += 1
+            if call_count < 4:
+                raise ValueError("fail")
+            return "ok"
+
+        start = time.monotonic()
+        result = await retry_async(
+            flaky,
+            max_retries=5,
+            delay=0.01,
+            backoff_factor=10,
+            max_delay=0.02,
+            jitter="full",
+        )
+        assert result == "ok"
+        assert time.monotonic() - start < 0.2
+
+    @pytest.mark.asyncio
+    async def test_retry_async_deadline(self):
+        """Test no retry starts past the deadline."""
+        call_count = 0
+
+        async def failing():
+            nonlocal call_count
+            call_count += 1
+            raise ValueError("fail")
+
+        stats = {}
+        with pytest.raises(ValueError):
+            await retry_async(
+                failing, max_retries=10, delay=0.03, deadline=0.05, stats=stats
+            )
+        assert call_count == 2
+        assert stats == {"calls": 1, "attempts": 2, "retries": 1, "suppressed": 1}
+
+    @pytest.mark.asyncio
+    async def test_retry_async_budget(self):
+        """Test an empty budget suppresses retries."""
+        budget = RetryBudget(min_tokens=0)
+        call_count = 0
+
+        async def failing():
+            nonlocal call_count
+            call_count += 1
+            raise ValueError("fail")
+
+        with pytest.raises(ValueError):
+            await retry_async(failing, max_retries=3, budget=budget)
+        assert call_count == 1
+        assert budget.info()["suppressed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_async_stats_aggregate(self):
+        """Test a stats dict reused across calls accumulates counters."""
+        outcomes = iter([ValueError("fail"), "ok", "ok"])
+
+        async def flaky():
+            outcome = next(outcomes)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        stats = {}
+        assert await retry_async(flaky, stats=stats) == "ok"
+        assert await retry_async(flaky, stats=stats) == "ok"
+        assert stats == {"calls": 2, "attempts": 3, "retries": 1, "suppressed": 0}
+
+
 class TestMapAsync:
     """Test map_async function."""
 
@@ -407,6 +680,205 @@ class TestFilterAsync:
         assert result == [1, 2, 3, 4, 5]
 
 
+class TestAmap:
+    """Test amap and afilter streaming helpers."""
+
+    @pytest.mark.asyncio
+    async def test_completion_order(self):
+        """Test results stream in completion order by default."""
+
+        async def delayed(x):
+            await asyncio.sleep(0.01 * (3 - x))
+            return x
+
+        results = [r async for r in amap(delayed, [0, 1, 2], concurrency=3)]
+        assert results == [2, 1, 0]
+
+    @pytest.mark.asyncio
+    async def test_input_order(self):
+        """Test ordered mode yields results in input order."""
+
+        async def delayed(x):
+            await asyncio.sleep(0.001 * (x % 5))
+            return x * 2
+
+        results = [
+            r async for r in amap(delayed, range(50), concurrency=4, ordered=True)
+        ]
+        assert results == [x * 2 for x in range(50)]
+
+    @pytest.mark.asyncio
+    async def test_pulls_input_lazily(self):
+        """Test items are pulled only as slots free up."""
+        pulled = []
+        running = 0
+        peak = 0
+
+        def source():
+            for i in range(1000):
+                pulled.append(i)
+                yield i
+
+        async def work(x):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return x
+
+        stream = amap(work, source(), concurrency=3)
+        first = [await stream.__anext__() for _ in range(5)]
+        await stream.aclose()
+
+        assert len(first) == 5
+        assert len(pulled) <= 8
+        assert peak <= 3
+
+    @pytest.mark.asyncio
+    async def test_bounded_reorder_buffer(self):
+        """Test a slow head item stops intake once the buffer is full."""
+        started = []
+        release = asyncio.Event()
+
+        async def work(x):
+            started.append(x)
+            if x == 0:
+                await release.wait()
+            return x
+
+        stream = amap(work, range(100), concurrency=2, ordered=True, buffer_size=3)
+        first = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.01)
+        assert not first.done()
+        assert len(started) == 5
+
+        release.set()
+        assert await first == 0
+        assert [r async for r in stream] == list(range(1, 100))
+
+    @pytest.mark.asyncio
+    async def test_async_iterable_and_filter(self):
+        """Test async iterables are accepted by afilter."""
+
+        async def source():
+            for i in range(10):
+                await asyncio.sleep(0)
+                yield i
+
+        async def is_even(x):
+            return x % 2 == 0
+
+        results = [r async for r in afilter(is_even, source(), ordered=True)]
+        assert results == [0, 2, 4, 6, 8]
+
+    @pytest.mark.asyncio
+    async def test_error_cancels_in_flight(self):
+        """Test an exception cancels the other running calls."""
+        cancelled = []
+
+        async def work(x):
+            if x == 0:
+                raise ValueError("boom")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(x)
+                raise
+
+        with pytest.raises(ValueError):
+            await map_async(work, [1, 2, 0])
+        assert sorted(cancelled) == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_invalid_concurrency(self):
+        """Test concurrency must be positive."""
+
+        async def work(x):
+            return x
+
+        with pytest.raises(ValueError):
+            [r async for r in amap(work, [1], concurrency=0)]
+
+
+class TestShortCircuit:
+    """Test some_async, every_async and find_async."""
+
+    @pytest.mark.asyncio
+    async def test_some_async_stops_early(self):
+        """Test a match cancels running checks and pulls no more items."""
+        checked = []
+        cancelled = []
+
+        async def is_three(x):
+            checked.append(x)
+            try:
+                await asyncio.sleep(0 if x == 3 else 0.05)
+            except asyncio.CancelledError:
+                cancelled.append(x)
+                raise
+            return x == 3
+
+        assert await some_async(is_three, range(1000), concurrency=4) is True
+        assert sorted(checked) == [0, 1, 2, 3]
+        assert sorted(cancelled) == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_some_and_every(self):
+        """Test results when no item decides early."""
+
+        async def positive(x):
+            await asyncio.sleep(0)
+            return x > 0
+
+        assert await some_async(positive, [-1, -2]) is False
+        assert await some_async(positive, []) is False
+        assert await every_async(positive, [1, 2, 3]) is True
+        assert await every_async(positive, [1, -2, 3]) is False
+        assert await every_async(positive, []) is True
+
+    @pytest.mark.asyncio
+    async def test_find_async_order(self):
+        """Test ordered find returns the first match in input order."""
+
+        async def is_even(x):
+            await asyncio.sleep(0.001 * (10 - x))
+            return x % 2 == 0
+
+        assert await find_async(is_even, [1, 2, 3, 4, 5, 6]) == 2
+        assert await find_async(is_even, [1, 2, 3, 4], ordered=False) == 4
+        assert await find_async(is_even, [1, 3], default="none") == "none"
+
+    @pytest.mark.asyncio
+    async def test_find_async_ordered_stops_past_match(self):
+        """Test items after a match are not started while earlier ones run."""
+        started = []
+
+        async def is_one(x):
+            started.append(x)
+            await asyncio.sleep({0: 0.05, 1: 0.001}.get(x, 0.01))
+            return x == 1
+
+        assert await find_async(is_one, range(100), concurrency=4) == 1
+        assert started == [0, 1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_async_iterable(self):
+        """Test async iterables stop being consumed after a match."""
+        produced = []
+
+        async def source():
+            for i in range(100):
+                produced.append(i)
+                yield i
+
+        async def is_five(x):
+            return x == 5
+
+        assert await find_async(is_five, source(), concurrency=2) == 5
+        assert len(produced) <= 8
+
+
 class TestRunInThread:
     """Test run_in_thread function."""
 
@@ -442,6 +914,65 @@ class TestRunInThread:
         assert result == expected
 
 
+def _square(x):
+    return x * x
+
+
+def _worker_pid(_):
+    return os.getpid()
+
+
+class TestExecutors:
+    """Test process pool offload helpers."""
+
+    def teardown_method(self):
+        """Shut down the pools created by a test."""
+        shutdown_executors()
+
+    @pytest.mark.asyncio
+    async def test_run_in_process(self):
+        """Test run_in_process runs in another process with a shared pool."""
+        assert await run_in_process(_worker_pid, None) != os.getpid()
+        assert await run_in_process(pow, 2, 10) == 1024
+        assert get_executor("process") is get_executor("process")
+
+    @pytest.mark.asyncio
+    async def test_map_async_process_chunks(self):
+        """Test map_async sends chunks to a registered process pool."""
+        register_executor("cpu", ProcessPoolExecutor(max_workers=2))
+
+        items = list(range(1000))
+        result = await map_async(_square, items, executor="cpu", chunksize=128)
+        assert result == [x * x for x in items]
+
+        pids = await map_async(_worker_pid, items, executor="cpu", chunksize=500)
+        assert len(set(pids)) <= 2
+        assert os.getpid() not in pids
+
+    @pytest.mark.asyncio
+    async def test_named_thread_pool(self):
+        """Test a registered thread pool is used by name."""
+        register_executor("io", ThreadPoolExecutor(thread_name_prefix="io-pool"))
+
+        def thread_name():
+            return threading.current_thread().name
+
+        assert (await run_in_executor("io", thread_name)).startswith("io-pool")
+        names = await map_async(
+            lambda _: thread_name(), [1, 2, 3], executor="io", chunksize=2
+        )
+        assert all(name.startswith("io-pool") for name in names)
+        assert await map_async(_square, [1, 2], executor="thread") == [1, 4]
+
+    @pytest.mark.asyncio
+    async def test_invalid_executor(self):
+        """Test unknown names and bad chunk sizes are rejected."""
+        with pytest.raises(ValueError, match="Unknown executor"):
+            await map_async(_square, [1], executor="missing")
+        with pytest.raises(ValueError):
+            await map_async(_square, [1], executor="thread", chunksize=0)
+
+
 class TestBatchProcess:
     """Test batch_process function."""
 
@@ -482,6 +1013,382 @@ class TestBatchProcess:
 
         assert result == [11, 12, 13]
 
+    @pytest.mark.asyncio
+    async def test_batch_process_calls_lazily(self):
+        """Test batches are only created once a worker is free."""
+        running = 0
+        peak = 0
+        calls = 0
+
+        async def process_batch(batch):
+            nonlocal running, peak, calls
+            calls += 1
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.001)
+            running -= 1
+            return batch
+
+        items = list(range(100))
+        result = await batch_process(items, process_batch, batch_size=7, concurrency=3)
+
+        assert result == items
+        assert calls == 15
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_process_adaptive(self):
+        """Test batch sizes move toward the target latency."""
+
+        async def process_batch(batch):
+            # 1ms per 10 items, so 50 items hit the 5ms target
+            await asyncio.sleep(len(batch) / 10_000)
+            return batch
+
+        sizer = AdaptiveBatchSizer(
+            target_latency=0.005, initial_size=10, increase=10, max_size=200
+        )
+        items = list(range(3000))
+        result = await batch_process(
+            items, process_batch, batch_size=sizer, concurrency=2
+        )
+
+        assert result == items
+        info = sizer.info()
+        assert info["items"] == 3000
+        assert sum(info["sizes"]) == 3000
+        assert info["sizes"][0] == 10
+        assert max(info["sizes"]) < 200
+
+    @pytest.mark.asyncio
+    async def test_batch_process_invalid_arguments(self):
+        """Test non-positive batch size or concurrency is rejected."""
+
+        async def process_batch(batch):
+            return batch
+
+        with pytest.raises(ValueError):
+            await batch_process([1], process_batch, concurrency=0)
+
+
+class TestBackgroundLoop:
+    """Test the sync bridge to a background event loop."""
+
+    def test_run_sync_reuses_loop(self):
+        """Test calls share one loop thread."""
+
+        async def loop_thread():
+            await asyncio.sleep(0)
+            return threading.current_thread().name, asyncio.get_running_loop()
+
+        first = run_sync(loop_thread())
+        second = run_sync(loop_thread())
+        assert first == second
+        assert first[0] == "pyutils-loop"
+
+    def test_map_sync(self):
+        """Test map_sync returns ordered results."""
+
+        async def double(x):
+            await asyncio.sleep(0.001 * (x % 3))
+            return x * 2
+
+        assert map_sync(double, list(range(20)), concurrency=4) == [
+            x * 2 for x in range(20)
+        ]
+
+    def test_timeout_cancels(self):
+        """Test a timed-out coroutine is cancelled on the loop."""
+        background = BackgroundLoop(name="test-loop")
+        cancelled = threading.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        try:
+            with pytest.raises(TimeoutError):
+                background.run_sync(slow(), timeout=0.02)
+            assert cancelled.wait(1)
+        finally:
+            background.shutdown()
+
+    def test_nested_call_rejected(self):
+        """Test run_sync from the loop thread raises instead of deadlocking."""
+        background = BackgroundLoop(name="test-loop")
+
+        async def inner():
+            return 1
+
+        async def outer():
+            return background.run_sync(inner())
+
+        try:
+            with pytest.raises(RuntimeError):
+                background.run_sync(outer())
+        finally:
+            background.shutdown()
+
+    def test_shutdown_and_restart(self):
+        """Test shutdown cancels tasks, stops the thread and allows restart."""
+        background = BackgroundLoop(name="test-loop")
+
+        tasks = []
+
+        async def start_forever():
+            tasks.append(asyncio.create_task(asyncio.sleep(10)))
+            return threading.current_thread()
+
+        thread = background.run_sync(start_forever())
+        background.shutdown()
+        assert not thread.is_alive()
+        assert tasks[0].cancelled()
+
+        async def answer():
+            return 42
+
+        assert background.run_sync(answer()) == 42
+        background.shutdown()
+
+
+class TestAdaptiveBatchSizer:
+    """Test AdaptiveBatchSizer."""
+
+    def test_aimd(self):
+        """Test additive increase and multiplicative decrease within bounds."""
+        sizer = AdaptiveBatchSizer(
+            target_latency=1.0, initial_size=10, min_size=4, max_size=30, increase=10
+        )
+        sizer.record(10, 0.5)
+        assert sizer.size == 20
+        sizer.record(20, 0.5)
+        sizer.record(30, 0.5)
+        assert sizer.size == 30
+        sizer.record(30, 2.0)
+        assert sizer.size == 15
+        for _ in range(5):
+            sizer.record(sizer.size, 2.0)
+        assert sizer.size == 4
+
+        info = sizer.info()
+        assert info["batches"] == 9
+        assert info["sizes"][:4] == [10, 20, 30, 30]
+
+    def test_invalid_options(self):
+        """Test invalid options are rejected."""
+        with pytest.raises(ValueError):
+            AdaptiveBatchSizer(target_latency=0)
+        with pytest.raises(ValueError):
+            AdaptiveBatchSizer(target_latency=1, initial_size=5, min_size=10)
+        with pytest.raises(ValueError):
+            AdaptiveBatchSizer(target_latency=1, decrease_factor=1)
+
+
+class TestBatchLoader:
+    """Test BatchLoader."""
+
+    @pytest.mark.asyncio
+    async def test_same_tick_loads_are_batched(self):
+        """Test concurrent loads become one deduplicated batch call."""
+        calls = []
+
+        async def fetch(keys):
+            calls.append(keys)
+            return [key * 10 for key in keys]
+
+        loader = BatchLoader(fetch)
+        results = await asyncio.gather(*(loader.load(k) for k in [1, 2, 1, 3, 2]))
+
+        assert results == [10, 20, 10, 30, 20]
+        assert calls == [[1, 2, 3]]
+
+    @pytest.mark.asyncio
+    async def test_cache_and_clear(self):
+        """Test cached keys are not fetched again until cleared."""
+        calls = []
+
+        async def fetch(keys):
+            calls.append(keys)
+            return [str(key) for key in keys]
+
+        loader = BatchLoader(fetch)
+        assert await loader.load(1) == "1"
+        assert await loader.load_many([1, 2]) == ["1", "2"]
+        assert calls == [[1], [2]]
+
+        loader.clear(1)
+        loader.prime(3, "three")
+        assert await loader.load_many([1, 3]) == ["1", "three"]
+        assert calls == [[1], [2], [1]]
+
+        loader.clear_all()
+        await loader.load(2)
+        assert calls[-1] == [2]
+
+    @pytest.mark.asyncio
+    async def test_max_batch_size_and_window(self):
+        """Test loads in the window are split by max_batch_size."""
+        calls = []
+
+        async def fetch(keys):
+            calls.append(keys)
+            return keys
+
+        loader = BatchLoader(fetch, max_batch_size=3, wait=0.01)
+
+        async def late(key):
+            await asyncio.sleep(0.002)
+            return await loader.load(key)
+
+        results = await asyncio.gather(
+            loader.load(0), loader.load(1), late(2), late(3), late(4)
+        )
+
+        assert results == [0, 1, 2, 3, 4]
+        assert calls == [[0, 1, 2], [3, 4]]
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_waiters_and_are_not_cached(self):
+        """Test a failing batch fails its keys and allows a retry."""
+        attempts = 0
+
+        async def fetch(keys):
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise ConnectionError("down")
+            return keys
+
+        loader = BatchLoader(fetch)
+        results = await asyncio.gather(
+            loader.load("a"), loader.load("b"), return_exceptions=True
+        )
+        assert all(isinstance(r, ConnectionError) for r in results)
+        assert await loader.load("a") == "a"
+
+    @pytest.mark.asyncio
+    async def test_wrong_result_length(self):
+        """Test batch_fn must return one value per key."""
+
+        async def fetch(keys):
+            return []
+
+        with pytest.raises(ValueError, match="0 values for 1 keys"):
+            await BatchLoader(fetch).load(1)
+
+    @pytest.mark.asyncio
+    async def test_no_cache(self):
+        """Test cache=False fetches again on later loads."""
+        calls = []
+
+        async def fetch(keys):
+            calls.append(keys)
+            return keys
+
+        loader = BatchLoader(fetch, cache=False)
+        await asyncio.gather(loader.load(1), loader.load(1))
+        await loader.load(1)
+        assert calls == [[1], [1]]
+
+
+class TestPipeline:
+    """Test Pipeline."""
+
+    @pytest.mark.asyncio
+    async def test_map_filter_batch(self):
+        """Test chained stages produce ordered output."""
+
+        async def double(x):
+            await asyncio.sleep(0.001 * (x % 3))
+            return x * 2
+
+        async def keep_small(x):
+            return x < 30
+
+        async def total(batch):
+            return sum(batch)
+
+        pipeline = (
+            Pipeline(range(20))
+            .map(double, concurrency=4)
+            .filter(keep_small)
+            .batch(4)
+            .map(total, concurrency=2)
+        )
+        result = await pipeline.run()
+
+        assert result == [12, 44, 76, 78]
+        stats = pipeline.stats()
+        assert [stage["items_out"] for stage in stats] == [20, 15, 4, 4]
+        assert stats[0]["stage"] == "0:double"
+        assert all(stage["done"] for stage in stats)
+
+    @pytest.mark.asyncio
+    async def test_slow_sink_throttles_source(self):
+        """Test bounded queues stop the source from running ahead."""
+        pulled = 0
+
+        def source():
+            nonlocal pulled
+            for i in range(1000):
+                pulled += 1
+                yield i
+
+        async def identity(x):
+            return x
+
+        consumed = 0
+        async for _ in Pipeline(source(), queue_size=5).map(identity):
+            consumed += 1
+            await asyncio.sleep(0.001)
+            if consumed == 10:
+                break
+
+        # Two queues of five plus the items held by the stages
+        assert pulled <= 10 + 2 * 5 + 3
+
+    @pytest.mark.asyncio
+    async def test_error_propagates_and_stops_stages(self):
+        """Test an error in one stage reaches the caller."""
+        cancelled = []
+
+        async def fail_on_three(x):
+            if x == 3:
+                raise ValueError("boom")
+            return x
+
+        async def slow(x):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(x)
+                raise
+
+        pipeline = Pipeline(range(100)).map(fail_on_three).map(slow, concurrency=2)
+        with pytest.raises(ValueError, match="boom"):
+            await pipeline.run()
+        assert cancelled
+
+    @pytest.mark.asyncio
+    async def test_async_source(self):
+        """Test async iterables feed the pipeline."""
+
+        async def source():
+            for i in range(5):
+                yield i
+
+        assert await Pipeline(source()).batch(2).run() == [[0, 1], [2, 3], [4]]
+
+    def test_invalid_arguments(self):
+        """Test invalid sizes are rejected."""
+        with pytest.raises(ValueError):
+            Pipeline([], queue_size=0)
+        with pytest.raises(ValueError):
+            Pipeline([]).batch(0)
+
 
 class TestAsyncTimer:
     """Test AsyncTimer context manager."""
@@ -509,6 +1416,59 @@ class TestAsyncTimer:
         assert timer.elapsed < 0.01
 
 
+class TestLoopMonitor:
+    """Test LoopMonitor."""
+
+    @pytest.mark.asyncio
+    async def test_detects_blocked_loop(self):
+        """Test a blocking call shows up as lag."""
+        async with LoopMonitor(interval=0.01, slow_threshold=0.03) as monitor:
+            await asyncio.sleep(0.03)
+            time.sleep(0.06)
+            await asyncio.sleep(0.03)
+
+        stats = monitor.stats()
+        assert stats["samples"] >= 2
+        assert stats["slow_callbacks"] >= 1
+        assert stats["lag_max"] >= 0.03
+        assert monitor.slow_callbacks[0]["lag"] >= 0.03
+
+    @pytest.mark.asyncio
+    async def test_track_tasks_flags_slow_steps(self):
+        """Test slow task steps are attributed to their coroutine."""
+
+        async def blocking_job():
+            time.sleep(0.03)
+            await asyncio.sleep(0)
+            return "done"
+
+        async with LoopMonitor(slow_threshold=0.02, track_tasks=True) as monitor:
+            assert await asyncio.create_task(blocking_job()) == "done"
+
+        assert asyncio.get_running_loop().get_task_factory() is None
+        assert monitor.stats()["task_steps"] >= 2
+        assert "blocking_job" in monitor.slow_tasks[0]["task"]
+
+    @pytest.mark.asyncio
+    async def test_counts_and_leaked_tasks(self):
+        """Test live tasks are counted and old pending tasks reported."""
+        stuck = asyncio.create_task(asyncio.sleep(10))
+
+        async with LoopMonitor(interval=0.01, leak_age=0.02) as monitor:
+            await asyncio.sleep(0.06)
+            assert stuck in monitor.leaked_tasks()
+
+        stats = monitor.stats()
+        assert stats["max_tasks"] >= 2
+        assert stats["leaked_tasks"] >= 1
+        stuck.cancel()
+
+    def test_invalid_options(self):
+        """Test invalid options are rejected."""
+        with pytest.raises(ValueError):
+            LoopMonitor(interval=0)
+
+
 class TestWithTimeoutDefault:
     """Test with_timeout_default function."""
 
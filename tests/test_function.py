@@ -3,18 +3,46 @@
 """Tests for function module."""
 
 import asyncio
+import gc
+import json
+import threading
 import time
+import weakref
+from concurrent.futures import ProcessPoolExecutor
 
 import pytest
 
 from pyutils.function import (
+    AsyncDebouncer,
+    AsyncThrottler,
+    BatchDebouncer,
+    CircuitBreaker,
+    CircuitOpenError,
     Debouncer,
+    FunctionProfile,
+    GCRALimiter,
+    KeyedDebouncer,
+    LatencyHistogram,
+    PollingScheduler,
+    ProfileRegistry,
+    RetryBudget,
+    SharedMemoryCache,
+    SlidingWindowLimiter,
+    SQLiteCache,
     Throttler,
+    TimerScheduler,
+    TokenBucket,
+    backoff_delays,
+    batch_debounce,
     create_polling,
     debounce,
+    debounce_async,
+    get_timer_scheduler,
     memoize,
     once,
+    profiled,
     throttle,
+    throttle_async,
     with_retry,
 )
 
@@ -89,6 +117,459 @@ class TestMemoize:
         func(1)
         assert call_count == 2  # Cache cleared, function called again
 
+    def test_memoize_binds_keyword_arguments(self):
+        """Test keyword and positional spellings share a cache entry."""
+        call_count = 0
+
+        @memoize
+        def func(a, b=1, *, c=0):
+            nonlocal call_count
+            call_count += 1
+            return a + b + c
+
+        assert func(1, 2) == 3
+        assert func(1, b=2) == 3
+        assert func(a=1, b=2) == 3
+        assert call_count == 1
+
+        assert func(1) == 2
+        assert func(1, c=1) == 3
+        assert func(1, c=1) == 3
+        assert call_count == 3
+
+    def test_memoize_unhashable_arguments(self):
+        """Test lists, dicts and sets are cached by content."""
+        call_count = 0
+
+        @memoize
+        def func(data, options=None):
+            nonlocal call_count
+            call_count += 1
+            return len(data)
+
+        assert func([1, 2, 3]) == 3
+        assert func([1, 2, 3]) == 3
+        assert call_count == 1
+
+        assert func({"a": [1], "b": {2}}, options={"x": 1}) == 2
+        assert func({"b": {2}, "a": [1]}, options={"x": 1}) == 2
+        assert call_count == 2
+
+        # Same contents in a different container type is a different key
+        assert func((1, 2, 3)) == 3
+        assert call_count == 3
+
+        assert func(bytearray(b"ab")) == 2
+        assert func(b"ab") == 2
+        assert call_count == 5
+
+        assert func({1, 2}) == 2
+        assert func(frozenset({1, 2})) == 2
+        assert call_count == 7
+
+    def test_memoize_rejects_unsupported_unhashable(self):
+        """Test unhashable objects that cannot be frozen raise TypeError."""
+
+        class Unhashable:
+            __hash__ = None
+
+        @memoize
+        def func(value):
+            return value
+
+        with pytest.raises(TypeError, match="Unhashable"):
+            func(Unhashable())
+
+    def test_memoize_lru_maxsize(self):
+        """Test least-recently-used eviction with maxsize."""
+        calls = []
+
+        @memoize(maxsize=2)
+        def func(x):
+            calls.append(x)
+            return x
+
+        func(1)
+        func(2)
+        func(1)  # 1 becomes most recently used
+        func(3)  # Evicts 2
+        func(1)
+        assert calls == [1, 2, 3]
+
+        func(2)
+        assert calls == [1, 2, 3, 2]
+
+        info = func.cache_info()
+        assert info["hits"] == 2
+        assert info["misses"] == 4
+        assert info["evictions"] == 2
+        assert info["currsize"] == 2
+
+    def test_memoize_lfu_policy(self):
+        """Test least-frequently-used eviction."""
+        calls = []
+
+        @memoize(maxsize=2, policy="lfu")
+        def func(x):
+            calls.append(x)
+            return x
+
+        func(1)
+        func(1)
+        func(1)
+        func(2)
+        func(3)  # Evicts 2, the least frequently used
+        func(1)
+        assert calls == [1, 2, 3]
+
+        func(2)
+        assert calls == [1, 2, 3, 2]
+
+    def test_memoize_ttl(self):
+        """Test entries expire after ttl."""
+        call_count = 0
+
+        @memoize(ttl=0.05)
+        def func(x):
+            nonlocal call_count
+            call_count += 1
+            return x
+
+        func(1)
+        func(1)
+        assert call_count == 1
+
+        time.sleep(0.1)
+        func(1)
+        assert call_count == 2
+
+    def test_memoize_ttl_purges_unread_keys(self):
+        """Test expired entries are dropped on insert even if never read."""
+
+        @memoize(ttl=0.05)
+        def func(x):
+            return x
+
+        for i in range(100):
+            func(i)
+        assert func.cache_info()["currsize"] == 100
+
+        time.sleep(0.1)
+        func("fresh")
+        assert func.cache_info()["currsize"] == 1
+
+    def test_memoize_ttl_does_not_keep_evicted_values(self):
+        """Test values evicted by maxsize are freed before their ttl."""
+
+        class Value:
+            pass
+
+        refs = []
+
+        @memoize(maxsize=2, ttl=3600)
+        def func(x):
+            value = Value()
+            refs.append(weakref.ref(value))
+            return value
+
+        for i in range(1000):
+            func(i)
+        gc.collect()
+
+        assert sum(ref() is not None for ref in refs) == 2
+        assert len(func.cache._expiries) <= 2 * 2 + 16
+
+    def test_memoize_max_bytes(self):
+        """Test size-aware eviction."""
+
+        @memoize(max_bytes=250, sizeof=lambda value: 100)
+        def func(x):
+            return x
+
+        func(1)
+        func(2)
+        func(3)
+
+        info = func.cache_info()
+        assert info["currsize"] == 2
+        assert info["bytes"] == 200
+        assert info["evictions"] == 1
+
+    def test_memoize_invalid_options(self):
+        """Test invalid options are rejected."""
+        with pytest.raises(ValueError, match="Unknown cache policy"):
+            memoize(policy="fifo")(lambda x: x)
+        with pytest.raises(ValueError, match="maxsize"):
+            memoize(maxsize=0)(lambda x: x)
+
+    def test_memoize_cache_clear_resets_info(self):
+        """Test cache_clear resets counters."""
+
+        @memoize(maxsize=10)
+        def func(x):
+            return x
+
+        func(1)
+        func(1)
+        assert len(func.cache) == 1
+
+        func.cache_clear()
+        assert len(func.cache) == 0
+        assert func.cache_info()["hits"] == 0
+
+    @pytest.mark.asyncio
+    async def test_memoize_async_bounded(self):
+        """Test bounded memoize on async functions."""
+        call_count = 0
+
+        @memoize(maxsize=1)
+        async def func(x):
+            nonlocal call_count
+            call_count += 1
+            return x * 2
+
+        assert await func(1) == 2
+        assert await func(1) == 2
+        assert call_count == 1
+
+        await func(2)
+        await func(1)
+        assert call_count == 3
+        assert func.cache_info()["evictions"] == 2
+
+    @pytest.mark.asyncio
+    async def test_memoize_async_coalesces_concurrent_calls(self):
+        """Test concurrent async calls with the same key share one call."""
+        call_count = 0
+
+        @memoize
+        async def func(x):
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.02)
+            return x * 2
+
+        results = await asyncio.gather(*[func(1) for _ in range(50)])
+        assert results == [2] * 50
+        assert call_count == 1
+
+        await asyncio.gather(func(1), func(2), func(2))
+        assert call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_memoize_async_failure_shared_and_not_cached(self):
+        """Test a failure reaches every waiter and is not cached."""
+        call_count = 0
+
+        @memoize
+        async def func(x):
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.01)
+            if call_count == 1:
+                raise ValueError("upstream down")
+            return x
+
+        results = await asyncio.gather(
+            *[func(1) for _ in range(10)], return_exceptions=True
+        )
+        assert call_count == 1
+        assert all(isinstance(r, ValueError) for r in results)
+
+        await asyncio.sleep(0)
+        assert await func(1) == 1
+        assert call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_memoize_async_waiter_cancel_does_not_cancel_call(self):
+        """Test cancelling one caller leaves the shared call running."""
+
+        @memoize
+        async def func(x):
+            await asyncio.sleep(0.02)
+            return x
+
+        first = asyncio.create_task(func(1))
+        second = asyncio.create_task(func(1))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == 1
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+
+class TestSQLiteCache:
+    """Test SQLiteCache memoize backend."""
+
+    def test_survives_restart(self, tmp_path):
+        """Test results are reused by a new cache on the same file."""
+        path = tmp_path / "memo.db"
+        call_count = 0
+
+        def compute(x):
+            nonlocal call_count
+            call_count += 1
+            return {"value": x * 2}
+
+        first = SQLiteCache(path, namespace="compute")
+        assert memoize(backend=first)(compute)(3) == {"value": 6}
+        first.close()
+
+        second = SQLiteCache(path, namespace="compute")
+        cached = memoize(backend=second)(compute)
+        assert cached(3) == {"value": 6}
+        assert call_count == 1
+        assert cached.cache_info()["hits"] == 1
+        second.close()
+
+    def test_namespaces_are_separate(self, tmp_path):
+        """Test namespaces do not share entries."""
+        path = tmp_path / "memo.db"
+        first = SQLiteCache(path, namespace="a")
+        second = SQLiteCache(path, namespace="b")
+
+        first.set((1,), "a")
+        assert second.get((1,), None) is None
+        assert first.get((1,)) == "a"
+
+        second.clear()
+        assert len(first) == 1
+        first.close()
+        second.close()
+
+    def test_default_namespace_is_per_function(self, tmp_path):
+        """Test functions memoized on one file without a namespace stay apart."""
+        cache = SQLiteCache(tmp_path / "memo.db")
+
+        @memoize(backend=cache)
+        def double(x):
+            return x * 2
+
+        @memoize(backend=cache)
+        def square(x):
+            return x * x
+
+        assert double(3) == 6
+        assert square(3) == 9
+        assert double.cache.namespace.endswith("double")
+        double.cache.close()
+        square.cache.close()
+        cache.close()
+
+    def test_ttl(self, tmp_path):
+        """Test expired entries are misses and removed on compaction."""
+        cache = SQLiteCache(tmp_path / "memo.db", ttl=0.05)
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+
+        time.sleep(0.1)
+        assert cache.get("key", None) is None
+        assert cache.compact() == 1
+        assert len(cache) == 0
+        cache.close()
+
+    def test_max_entries_compaction(self, tmp_path):
+        """Test oldest entries are dropped beyond max_entries."""
+        cache = SQLiteCache(tmp_path / "memo.db", max_entries=3, compact_interval=1)
+        for i in range(5):
+            cache.set(i, i)
+
+        assert len(cache) == 3
+        assert 0 not in cache
+        assert 4 in cache
+        assert cache.info()["evictions"] == 2
+        cache.close()
+
+    def test_max_bytes_compaction(self, tmp_path):
+        """Test entries are dropped beyond max_bytes."""
+        cache = SQLiteCache(
+            tmp_path / "memo.db",
+            max_bytes=10,
+            serializer=json,
+            compact_interval=1,
+        )
+        cache.set("a", "xxxx")
+        cache.set("b", "yyyy")
+        assert len(cache) == 1
+        assert cache.get("b") == "yyyy"
+        cache.close()
+
+    def test_memoize_rejects_limits_with_backend(self, tmp_path):
+        """Test limits must be configured on the backend."""
+        cache = SQLiteCache(tmp_path / "memo.db")
+        with pytest.raises(ValueError, match="backend"):
+            memoize(backend=cache, maxsize=10)(lambda x: x)
+        cache.close()
+
+
+def _square_in_worker(cache, n):
+    """Memoized work executed inside a pool worker."""
+    return memoize(backend=cache)(lambda x: x * x)(n)
+
+
+class TestSharedMemoryCache:
+    """Test SharedMemoryCache memoize backend."""
+
+    @pytest.fixture
+    def cache(self):
+        cache = SharedMemoryCache(slots=16, slot_size=256)
+        yield cache
+        cache.close()
+        cache.unlink()
+
+    def test_get_set(self, cache):
+        """Test values round-trip through shared memory."""
+        cache.set(("a", 1), {"value": [1, 2]})
+        assert cache.get(("a", 1)) == {"value": [1, 2]}
+        assert cache.get(("a", 2), None) is None
+        assert ("a", 1) in cache
+        assert len(cache) == 1
+
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_attach_by_name(self, cache):
+        """Test a second instance sees entries and the stored layout."""
+        cache.set("key", "value")
+
+        other = SharedMemoryCache(cache.name)
+        assert not other.owner
+        assert other.slots == 16
+        assert other.get("key") == "value"
+        other.close()
+
+    def test_full_bucket_evicts(self):
+        """Test new keys overwrite old ones when a bucket is full."""
+        cache = SharedMemoryCache(slots=2, slot_size=128, ways=2)
+        for i in range(5):
+            cache.set(i, i)
+
+        assert len(cache) == 2
+        assert cache.info()["evictions"] == 3
+        assert cache.get(4) == 4
+        cache.close()
+        cache.unlink()
+
+    def test_oversized_value_skipped(self, cache):
+        """Test values larger than a slot are not stored."""
+        cache.set("big", "x" * 1000)
+        assert "big" not in cache
+
+    def test_shared_with_pool_workers(self, cache):
+        """Test pool workers write results the parent can read."""
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(_square_in_worker, [cache] * 4, range(4)))
+
+        assert results == [0, 1, 4, 9]
+        assert cache.get((3,)) == 9
+        assert len(cache) == 4
+
+    def test_invalid_layout(self):
+        """Test invalid layouts are rejected."""
+        with pytest.raises(ValueError, match="multiple of ways"):
+            SharedMemoryCache(slots=10, ways=4)
+
 
 class TestOnce:
     """Test once decorator."""
@@ -130,6 +611,104 @@ class TestOnce:
         assert result2 == 3  # Returns first result
         assert call_count == 1
 
+    def test_once_concurrent_threads(self):
+        """Test concurrent first calls run the function only once."""
+        call_count = 0
+        start = threading.Barrier(8)
+
+        @once
+        def init_func():
+            nonlocal call_count
+            call_count += 1
+            time.sleep(0.02)
+            return "initialized"
+
+        results = []
+
+        def worker():
+            start.wait()
+            results.append(init_func())
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert call_count == 1
+        assert results == ["initialized"] * 8
+
+    def test_once_retries_after_error(self):
+        """Test a failed first call does not count as done."""
+        attempts = []
+
+        @once
+        def init_func():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("not ready")
+            return "initialized"
+
+        with pytest.raises(RuntimeError):
+            init_func()
+        assert init_func() == "initialized"
+        assert init_func() == "initialized"
+        assert len(attempts) == 2
+
+    def test_once_reset(self):
+        """Test reset makes the next call run the function again."""
+        call_count = 0
+
+        @once
+        def init_func():
+            nonlocal call_count
+            call_count += 1
+            return call_count
+
+        assert init_func() == 1
+        init_func.reset()
+        assert init_func() == 2
+        assert init_func() == 2
+
+    @pytest.mark.asyncio
+    async def test_once_async_shares_one_task(self):
+        """Test concurrent awaits share one initialization."""
+        call_count = 0
+
+        @once
+        async def init_func():
+            nonlocal call_count
+            call_count += 1
+            await asyncio.sleep(0.01)
+            return "initialized"
+
+        results = await asyncio.gather(*(init_func() for _ in range(5)))
+        assert results == ["initialized"] * 5
+        assert await init_func() == "initialized"
+        assert call_count == 1
+
+        init_func.reset()
+        assert await init_func() == "initialized"
+        assert call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_once_async_retries_after_error(self):
+        """Test a failed async initialization is retried."""
+        attempts = []
+
+        @once
+        async def init_func():
+            attempts.append(1)
+            await asyncio.sleep(0)
+            if len(attempts) == 1:
+                raise RuntimeError("not ready")
+            return "initialized"
+
+        with pytest.raises(RuntimeError):
+            await init_func()
+        assert await init_func() == "initialized"
+        assert len(attempts) == 2
+
 
 class TestDebounce:
     """Test debounce functionality."""
@@ -393,6 +972,345 @@ class TestWithRetry:
         assert call_count == 2
 
 
+class TestAsyncDebounce:
+    """Test asyncio-native debounce and throttle."""
+
+    @pytest.mark.asyncio
+    async def test_debounce_async_trailing_result(self):
+        """Test every caller gets the trailing result."""
+        calls = []
+
+        @debounce_async(wait=0.05)
+        async def save(value):
+            calls.append(value)
+            return f"saved {value}"
+
+        futures = [save(i) for i in range(5)]
+        results = await asyncio.gather(*futures)
+
+        assert calls == [4]
+        assert results == ["saved 4"] * 5
+        assert not save.pending()
+
+    @pytest.mark.asyncio
+    async def test_debounce_async_extends_deadline(self):
+        """Test calls inside the window push the deadline back."""
+        calls = []
+        debounced = AsyncDebouncer(calls.append, wait=0.05)
+
+        debounced(1)
+        await asyncio.sleep(0.03)
+        debounced(2)
+        await asyncio.sleep(0.03)
+        assert calls == []
+
+        await asyncio.sleep(0.05)
+        assert calls == [2]
+
+    @pytest.mark.asyncio
+    async def test_debounce_async_leading(self):
+        """Test leading-only debounce runs on the first call."""
+        calls = []
+
+        @debounce_async(wait=0.05, leading=True, trailing=False)
+        def handler(value):
+            calls.append(value)
+            return value
+
+        assert await handler("first") == "first"
+        assert await handler("second") == "first"
+        assert calls == ["first"]
+
+    @pytest.mark.asyncio
+    async def test_debounce_async_error_propagates(self):
+        """Test a failing trailing call rejects the waiting futures."""
+
+        @debounce_async(wait=0.01)
+        async def failing():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError, match="boom"):
+            await failing()
+
+    @pytest.mark.asyncio
+    async def test_debounce_async_flush_and_cancel(self):
+        """Test flush runs immediately and cancel drops the call."""
+        calls = []
+        debounced = AsyncDebouncer(lambda v: calls.append(v) or v, wait=0.05)
+
+        waiter = debounced("a")
+        assert await debounced.flush() == "a"
+        assert await waiter == "a"
+        assert not debounced.pending()
+
+        waiter = debounced("b")
+        debounced.cancel()
+        await asyncio.sleep(0.08)
+        assert calls == ["a"]
+        assert waiter.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_throttle_async(self):
+        """Test throttle runs at most once per window."""
+        calls = []
+
+        @throttle_async(wait=0.05, leading=True, trailing=True)
+        def handler(value):
+            calls.append(value)
+            return value
+
+        first = handler(1)
+        handler(2)
+        last = handler(3)
+
+        assert calls == [1]
+        assert await first == 3
+        assert await last == 3
+        assert calls == [1, 3]
+        assert isinstance(handler, AsyncThrottler)
+
+
+class TestRateLimiters:
+    """Test TokenBucket, GCRALimiter and SlidingWindowLimiter."""
+
+    def test_token_bucket_burst_then_rate(self):
+        """Test the bucket allows a burst and then refills at rate."""
+        bucket = TokenBucket(rate=100, capacity=3)
+
+        assert all(bucket.try_acquire() for _ in range(3))
+        assert not bucket.try_acquire()
+
+        time.sleep(0.02)
+        assert bucket.try_acquire()
+
+    def test_token_bucket_reserve_waits_in_order(self):
+        """Test reservations in debt return increasing waits."""
+        bucket = TokenBucket(rate=10, capacity=1)
+
+        assert bucket.reserve() == 0
+        assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+        assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+    def test_token_bucket_acquire_blocks(self):
+        """Test acquire sleeps until tokens are available."""
+        bucket = TokenBucket(rate=50, capacity=1)
+        start = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        assert time.monotonic() - start >= 0.035
+
+    def test_gcra(self):
+        """Test GCRA allows burst requests and spaces the rest."""
+        limiter = GCRALimiter(rate=100, burst=2)
+
+        assert limiter.try_acquire()
+        assert limiter.try_acquire()
+        assert not limiter.try_acquire()
+        assert limiter.reserve() == pytest.approx(0.01, abs=0.005)
+
+    def test_sliding_window(self):
+        """Test no more than limit permits within any window."""
+        limiter = SlidingWindowLimiter(limit=3, window=0.05)
+
+        assert all(limiter.try_acquire() for _ in range(3))
+        assert not limiter.try_acquire()
+        assert limiter.reserve() == pytest.approx(0.05, abs=0.01)
+
+        time.sleep(0.11)
+        assert limiter.try_acquire(2)
+
+    def test_acquire_more_than_capacity(self):
+        """Test requests that can never be served are rejected."""
+        with pytest.raises(ValueError, match="capacity"):
+            TokenBucket(rate=1, capacity=2).acquire(3)
+        with pytest.raises(ValueError, match="burst"):
+            GCRALimiter(rate=1).acquire(2)
+        with pytest.raises(ValueError, match="limit"):
+            SlidingWindowLimiter(limit=1).acquire(2)
+
+    def test_sync_decorator_and_context_manager(self):
+        """Test decorator and with-statement take permits."""
+        limiter = TokenBucket(rate=1000, capacity=2)
+
+        @limiter
+        def call(x):
+            return x
+
+        assert call(1) == 1
+        with limiter:
+            pass
+        assert not limiter.try_acquire()
+
+    @pytest.mark.asyncio
+    async def test_async_usage(self):
+        """Test acquire_async, async with and async decorator."""
+        limiter = SlidingWindowLimiter(limit=2, window=0.05)
+
+        @limiter
+        async def call(x):
+            return x
+
+        start = time.monotonic()
+        await limiter.acquire_async()
+        async with limiter:
+            pass
+        assert await call(3) == 3
+        assert time.monotonic() - start >= 0.04
+
+    @pytest.mark.asyncio
+    async def test_cancelled_acquire_async_refunds(self):
+        """Test a cancelled waiter gives its reservation back."""
+        for limiter in (
+            TokenBucket(rate=10, capacity=1),
+            GCRALimiter(rate=10),
+            SlidingWindowLimiter(limit=1, window=0.1),
+        ):
+            assert limiter.try_acquire()
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(limiter.acquire_async(), 0.02)
+
+            # Without the refund the next caller would queue behind it
+            assert limiter.reserve() < 0.1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_in_queue_keeps_its_slot(self):
+        """Test cancelling a waiter with one queued behind it refunds nothing."""
+        for limiter in (
+            TokenBucket(rate=10, capacity=1),
+            GCRALimiter(rate=10),
+            SlidingWindowLimiter(limit=1, window=0.1),
+        ):
+            assert limiter.try_acquire()
+            first = asyncio.create_task(limiter.acquire_async())
+            second = asyncio.create_task(limiter.acquire_async())
+            await asyncio.sleep(0)
+            first.cancel()
+            await asyncio.gather(first, return_exceptions=True)
+
+            # The second waiter still holds the slot at ~0.2s
+            assert limiter.reserve() > 0.25
+            second.cancel()
+            await asyncio.gather(second, return_exceptions=True)
+
+
+class TestRetryBackoff:
+    """Test backoff_delays, deadlines and retry budgets."""
+
+    def test_backoff_delays_exponential_capped(self):
+        """Test exact delays grow and are capped."""
+        delays = backoff_delays(0.1, 2, max_delay=0.5)
+        assert [round(next(delays), 3) for _ in range(5)] == [0.1, 0.2, 0.4, 0.5, 0.5]
+
+    def test_backoff_delays_full_jitter(self):
+        """Test full jitter stays between 0 and the exponential delay."""
+        delays = backoff_delays(1, 2, jitter="full")
+        for attempt in range(6):
+            assert 0 <= next(delays) <= 2**attempt
+
+    def test_backoff_delays_decorrelated_jitter(self):
+        """Test decorrelated jitter stays between delay and max_delay."""
+        delays = backoff_delays(1, max_delay=10, jitter="decorrelated")
+        values = [next(delays) for _ in range(50)]
+        assert all(1 <= value <= 10 for value in values)
+        assert len(set(values)) > 1
+
+    def test_backoff_delays_invalid_jitter(self):
+        """Test unknown jitter strategies are rejected when decorating."""
+        with pytest.raises(ValueError, match="jitter"):
+            with_retry(jitter="equal")
+
+    def test_retry_deadline(self):
+        """Test no retry starts past the deadline."""
+        call_count = 0
+
+        budget = RetryBudget()
+
+        @with_retry(max_retries=10, delay=0.03, deadline=0.05, budget=budget)
+        def failing():
+            nonlocal call_count
+            call_count += 1
+            raise ValueError("fail")
+
+        with pytest.raises(ValueError):
+            failing()
+        assert call_count == 2
+        assert failing.retry_info()["suppressed"] == 1
+        assert budget.info()["suppressed"] == 1
+
+    def test_retry_budget_suppresses_retries(self):
+        """Test retries stop once the budget is spent."""
+        budget = RetryBudget(ratio=0.1, min_tokens=2)
+
+        @with_retry(max_retries=5, budget=budget)
+        def failing():
+            raise ValueError("fail")
+
+        with pytest.raises(ValueError):
+            failing()
+        with pytest.raises(ValueError):
+            failing()
+
+        info = failing.retry_info()
+        assert info["calls"] == 2
+        assert info["retries"] == 2
+        assert info["suppressed"] == 2
+        assert info["attempts"] == 4
+        assert budget.info()["suppressed"] == 2
+        assert budget.info()["requests"] == 2
+
+    def test_retry_budget_refills_with_requests(self):
+        """Test successful requests earn retries back."""
+        budget = RetryBudget(ratio=0.5, min_tokens=0)
+        assert not budget.try_retry()
+
+        budget.record_request()
+        budget.record_request()
+        assert budget.try_retry()
+        assert not budget.try_retry()
+
+    def test_retry_info_counts_every_thread(self):
+        """Test counters do not lose updates under concurrent calls."""
+
+        @with_retry()
+        def work():
+            return None
+
+        def worker():
+            for _ in range(2000):
+                work()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        info = work.retry_info()
+        assert info["calls"] == 16000
+        assert info["attempts"] == 16000
+
+    @pytest.mark.asyncio
+    async def test_async_retry_info(self):
+        """Test counters on async functions."""
+        call_count = 0
+
+        @with_retry(max_retries=2, delay=0.001, jitter="full")
+        async def flaky():
+            nonlocal call_count
+            call_count += 1
+            if call_count < 2:
+                raise ValueError("fail")
+            return "ok"
+
+        assert await flaky() == "ok"
+        assert flaky.retry_info() == {
+            "calls": 1,
+            "attempts": 2,
+            "retries": 1,
+            "suppressed": 0,
+        }
+
+
 class TestPollingController:
     """Test PollingController and create_polling."""
 
@@ -537,6 +1455,194 @@ class TestPollingController:
         assert progress_calls[2]["step"] == 3
 
 
+class TestPollingScheduler:
+    """Test PollingScheduler and the new polling options."""
+
+    @pytest.mark.asyncio
+    async def test_many_pollers_share_one_scheduler(self):
+        """Test pollers run through one scheduler and report aggregate status."""
+        scheduler = PollingScheduler()
+        counts = [0] * 100
+
+        def make_task(i):
+            async def task():
+                counts[i] += 1
+                return counts[i]
+
+            return task
+
+        controllers = [
+            create_polling(
+                make_task(i),
+                interval=0.01,
+                max_executions=3,
+                immediate=True,
+                scheduler=scheduler,
+            )
+            for i in range(100)
+        ]
+
+        starts = [asyncio.create_task(c.start()) for c in controllers]
+        await asyncio.sleep(0)
+        status = scheduler.status()
+        assert status["pollers"] == 100
+
+        await asyncio.gather(*starts)
+        assert counts == [3] * 100
+        assert scheduler.status()["pollers"] == 0
+        assert all(c.status()["status"] == "stopped" for c in controllers)
+
+    @pytest.mark.asyncio
+    async def test_backoff_on_unchanged_result(self):
+        """Test the interval grows while the result does not change."""
+
+        async def task():
+            return "same"
+
+        controller = create_polling(
+            task,
+            interval=0.01,
+            max_executions=4,
+            immediate=True,
+            backoff_factor=2.0,
+            max_interval=0.03,
+        )
+        await controller.start()
+
+        assert controller.status()["current_interval"] == 0.03
+
+    @pytest.mark.asyncio
+    async def test_backoff_resets_on_change(self):
+        """Test a changed result restores the base interval."""
+        values = iter(["a", "a", "b", "c"])
+
+        async def task():
+            return next(values)
+
+        controller = create_polling(
+            task, interval=0.01, max_executions=4, immediate=True, backoff_factor=3.0
+        )
+        await controller.start()
+
+        assert controller.current_interval == 0.01
+
+    @pytest.mark.asyncio
+    async def test_ambiguous_equality_is_not_an_error(self):
+        """Test results whose == cannot be used as a bool still poll fine."""
+
+        class Ambiguous:
+            def __eq__(self, other):
+                raise ValueError("truth value is ambiguous")
+
+            __hash__ = object.__hash__
+
+        async def task():
+            return Ambiguous()
+
+        for backoff_factor in (1.0, 2.0):
+            controller = create_polling(
+                task,
+                interval=0.01,
+                max_executions=3,
+                immediate=True,
+                backoff_factor=backoff_factor,
+            )
+            await controller.start()
+            assert controller.status()["error_count"] == 0
+            assert controller.current_interval == 0.01
+
+    @pytest.mark.asyncio
+    async def test_jitter_spreads_delays(self):
+        """Test jittered delays vary around the interval."""
+
+        async def task():
+            return None
+
+        controller = create_polling(task, interval=1.0, jitter=0.5)
+        delays = {controller._delay() for _ in range(20)}
+
+        assert len(delays) > 1
+        assert all(0.5 <= d <= 1.5 for d in delays)
+
+    @pytest.mark.asyncio
+    async def test_error_raised_from_start(self):
+        """Test quit_on_error surfaces the task error from start()."""
+
+        async def task():
+            raise ValueError("poll failed")
+
+        controller = create_polling(task, interval=0.01, max_retries=2, immediate=True)
+        with pytest.raises(ValueError, match="poll failed"):
+            await controller.start()
+        assert controller.status()["error_count"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelling_start_stops_polling(self):
+        """Test a wait_for timeout around start() stops further polls."""
+        calls = 0
+
+        async def task():
+            nonlocal calls
+            calls += 1
+
+        controller = create_polling(task, interval=0.01, immediate=True)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(controller.start(), 0.035)
+
+        assert not controller.is_active
+        seen = calls
+        await asyncio.sleep(0.05)
+        assert calls == seen
+
+    @pytest.mark.asyncio
+    async def test_error_action_failure_raised_from_start(self):
+        """Test an exception from error_action ends start() instead of hanging."""
+
+        async def task():
+            raise ValueError("poll failed")
+
+        def error_action(error):
+            raise RuntimeError("handler failed")
+
+        controller = create_polling(
+            task, interval=0.01, immediate=True, error_action=error_action
+        )
+        with pytest.raises(RuntimeError, match="handler failed"):
+            await asyncio.wait_for(controller.start(), 1.0)
+        assert not controller.is_active
+
+    def test_finished_loops_are_not_kept_alive(self):
+        """Test per-loop schedulers do not hold on to closed event loops."""
+        loops = []
+
+        async def main():
+            loops.append(weakref.ref(asyncio.get_running_loop()))
+
+            async def task():
+                return None
+
+            await create_polling(
+                task, interval=0.001, max_executions=2, immediate=True
+            ).start()
+
+        for _ in range(3):
+            asyncio.run(main())
+        gc.collect()
+
+        assert all(ref() is None for ref in loops)
+
+    def test_invalid_options(self):
+        """Test invalid jitter and backoff are rejected."""
+
+        async def task():
+            return None
+
+        with pytest.raises(ValueError, match="jitter"):
+            create_polling(task, jitter=1.5)
+        with pytest.raises(ValueError, match="backoff_factor"):
+            create_polling(task, backoff_factor=0.5)
+
+
 class TestDebouncer:
     """Test Debouncer class directly."""
 
@@ -571,6 +1677,131 @@ class TestDebouncer:
         time.sleep(0.25)
         assert call_count == 1
 
+    def test_debouncer_recovers_after_func_raises(self):
+        """Test a failing trailing call does not leave the debouncer stuck."""
+        calls = []
+
+        def test_func(value):
+            calls.append(value)
+            if value == 1:
+                raise ValueError("boom")
+
+        debouncer = Debouncer(test_func, wait=0.02, scheduler=TimerScheduler())
+
+        for value in (1, 2, 3):
+            debouncer(value)
+            time.sleep(0.1)
+
+        assert calls == [1, 2, 3]
+        assert not debouncer.pending()
+
+
+class TestKeyedDebouncer:
+    """Test KeyedDebouncer."""
+
+    def test_keys_are_debounced_independently(self):
+        """Test each key fires once with its latest arguments."""
+        calls = []
+        debounced = KeyedDebouncer(lambda key, value: calls.append((key, value)), 0.05)
+
+        for i in range(3):
+            debounced("a", i)
+            debounced("b", i * 10)
+        debounced("c", "x")
+
+        assert len(debounced) == 3
+        time.sleep(0.15)
+        assert sorted(calls) == [("a", 2), ("b", 20), ("c", "x")]
+        assert len(debounced) == 0
+        assert not debounced.pending()
+
+    def test_recalled_key_waits_longer(self):
+        """Test calling a key again pushes only that key back."""
+        calls = []
+        debounced = KeyedDebouncer(lambda key: calls.append(key), wait=0.06)
+
+        debounced("a")
+        debounced("b")
+        time.sleep(0.04)
+        debounced("a")
+        time.sleep(0.05)
+        assert calls == ["b"]
+
+        time.sleep(0.06)
+        assert calls == ["b", "a"]
+
+    def test_cancel_and_flush(self):
+        """Test cancel and flush per key and for all keys."""
+        calls = []
+        debounced = KeyedDebouncer(lambda key, v: calls.append(key) or v, 0.05)
+
+        debounced("a", 1)
+        debounced("b", 2)
+        debounced("c", 3)
+        debounced.cancel("a")
+        assert not debounced.pending("a")
+        assert debounced.flush("b") == 2
+        assert calls == ["b"]
+
+        debounced.flush()
+        assert calls == ["b", "c"]
+
+        debounced("d", 4)
+        debounced.cancel()
+        time.sleep(0.1)
+        assert calls == ["b", "c"]
+
+
+class TestBatchDebouncer:
+    """Test BatchDebouncer and batch_debounce."""
+
+    def test_window_delivers_one_batch(self):
+        """Test calls in one window arrive as a single list."""
+        batches = []
+
+        @batch_debounce(wait=0.05)
+        def insert_rows(rows):
+            batches.append(rows)
+
+        for i in range(5):
+            insert_rows({"id": i})
+        insert_rows("a", 1)
+
+        assert len(insert_rows) == 6
+        time.sleep(0.12)
+        assert batches == [[{"id": i} for i in range(5)] + [("a", 1)]]
+        assert not insert_rows.pending()
+
+    def test_max_batch_size_flushes_early(self):
+        """Test a full buffer is delivered without waiting."""
+        batches = []
+        batcher = BatchDebouncer(batches.append, wait=0.05, max_batch_size=3)
+
+        for i in range(7):
+            batcher(i)
+
+        assert batches == [[0, 1, 2], [3, 4, 5]]
+        time.sleep(0.12)
+        assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+    def test_flush_and_cancel(self):
+        """Test flush delivers now and cancel drops the buffer."""
+        batcher = BatchDebouncer(len, wait=0.05)
+
+        batcher(1)
+        batcher(2)
+        assert batcher.flush() == 2
+
+        batcher(3)
+        batcher.cancel()
+        assert not batcher.pending()
+        assert batcher.flush() == 2
+
+    def test_invalid_max_batch_size(self):
+        """Test max_batch_size must be positive."""
+        with pytest.raises(ValueError, match="max_batch_size"):
+            BatchDebouncer(len, max_batch_size=0)
+
 
 class TestThrottler:
     """Test Throttler class directly."""
@@ -604,3 +1835,377 @@ class TestThrottler:
         throttler()
         throttler()
         assert call_count == 1  # Should not increase due to throttling
+
+    def test_throttler_recovers_after_func_raises(self):
+        """Test a failing trailing call does not leave the throttler stuck."""
+        calls = []
+
+        def test_func(value):
+            calls.append(value)
+            if value == 1:
+                raise ValueError("boom")
+
+        throttler = Throttler(test_func, wait=0.02, scheduler=TimerScheduler())
+
+        for value in (1, 2, 3):
+            throttler(value)
+            time.sleep(0.1)
+
+        assert calls == [1, 2, 3]
+        assert throttler.timer is None
+
+
+class TestTimerScheduler:
+    """Test TimerScheduler."""
+
+    def test_callbacks_run_in_deadline_order(self):
+        """Test callbacks fire in deadline order on the worker pool."""
+        scheduler = TimerScheduler()
+        fired = []
+        threads = set()
+
+        def record(name):
+            fired.append(name)
+            threads.add(threading.current_thread().name)
+
+        scheduler.call_later(0.06, lambda: record("late"))
+        scheduler.call_later(0.02, lambda: record("early"))
+        scheduler.call_later(0.04, lambda: record("middle"))
+
+        time.sleep(0.15)
+        assert fired == ["early", "middle", "late"]
+        assert all(name.startswith("pyutils-timer-worker") for name in threads)
+
+    def test_slow_callback_does_not_delay_others(self):
+        """Test a long callback does not hold back later deadlines."""
+        scheduler = TimerScheduler()
+        fired = threading.Event()
+        release = threading.Event()
+
+        scheduler.call_later(0.01, lambda: release.wait(1))
+        start = time.monotonic()
+        scheduler.call_later(0.03, fired.set)
+
+        assert fired.wait(0.5)
+        assert time.monotonic() - start < 0.3
+        release.set()
+
+    def test_cancel(self):
+        """Test cancelled callbacks do not run."""
+        scheduler = TimerScheduler()
+        fired = []
+
+        handle = scheduler.call_later(0.02, lambda: fired.append(1))
+        handle.cancel()
+
+        time.sleep(0.06)
+        assert fired == []
+        assert scheduler.pending() == 0
+
+    def test_failing_callback_does_not_stop_scheduler(self):
+        """Test an exception in one callback leaves the others running."""
+        scheduler = TimerScheduler()
+        fired = []
+
+        def fail():
+            raise RuntimeError("boom")
+
+        scheduler.call_later(0.01, fail)
+        scheduler.call_later(0.03, lambda: fired.append(1))
+
+        time.sleep(0.08)
+        assert fired == [1]
+
+    def test_debouncers_share_one_thread(self):
+        """Test many debouncers do not start a thread each."""
+        get_timer_scheduler()
+        threads_before = threading.active_count()
+        calls = []
+
+        debouncers = [Debouncer(calls.append, wait=0.02) for _ in range(50)]
+        for i, debounced in enumerate(debouncers):
+            for _ in range(10):
+                debounced(i)
+
+        assert threading.active_count() <= threads_before + 1
+        time.sleep(0.1)
+        assert sorted(calls) == list(range(50))
+
+
+class TestCircuitBreaker:
+    """Test CircuitBreaker."""
+
+    def test_opens_on_failure_rate(self):
+        """Test the circuit opens once the failure rate crosses the threshold."""
+        breaker = CircuitBreaker(failure_threshold=0.5, min_calls=4, cooldown=10)
+        calls = []
+
+        @breaker
+        def call(ok):
+            calls.append(ok)
+            if not ok:
+                raise ValueError("down")
+            return ok
+
+        assert call(True) is True
+        for _ in range(2):
+            with pytest.raises(ValueError):
+                call(False)
+        assert breaker.state == "closed"
+
+        with pytest.raises(ValueError):
+            call(False)
+        assert breaker.state == "open"
+
+        with pytest.raises(CircuitOpenError):
+            call(True)
+        assert len(calls) == 4
+        assert breaker.status()["rejected"] == 1
+
+    def test_half_open_probe_closes_or_reopens(self):
+        """Test probes after the cooldown close or reopen the circuit."""
+        breaker = CircuitBreaker(min_calls=1, cooldown=0.05)
+
+        @breaker
+        def call(ok):
+            if not ok:
+                raise ValueError("down")
+            return ok
+
+        with pytest.raises(ValueError):
+            call(False)
+        assert breaker.state == "open"
+
+        time.sleep(0.06)
+        assert breaker.state == "half_open"
+        with pytest.raises(ValueError):
+            call(False)
+        assert breaker.state == "open"
+
+        time.sleep(0.06)
+        assert call(True) is True
+        assert breaker.state == "closed"
+        assert breaker.status()["failures"] == 0
+
+    def test_should_count_ignores_errors(self):
+        """Test errors rejected by should_count do not open the circuit."""
+        breaker = CircuitBreaker(
+            min_calls=1, should_count=lambda e: not isinstance(e, KeyError)
+        )
+
+        @breaker
+        def call():
+            raise KeyError("missing")
+
+        for _ in range(3):
+            with pytest.raises(KeyError):
+                call()
+        assert breaker.state == "closed"
+        assert breaker.status()["successes"] == 3
+
+    @pytest.mark.asyncio
+    async def test_async_half_open_allows_one_probe(self):
+        """Test only one coroutine probes while half-open."""
+        breaker = CircuitBreaker(min_calls=1, cooldown=0.02)
+        release = asyncio.Event()
+
+        @breaker
+        async def call(ok):
+            if not ok:
+                raise ValueError("down")
+            await release.wait()
+            return ok
+
+        with pytest.raises(ValueError):
+            await call(False)
+        await asyncio.sleep(0.03)
+
+        probe = asyncio.create_task(call(True))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await call(True)
+
+        release.set()
+        assert await probe is True
+        assert breaker.state == "closed"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_probe_frees_slot(self):
+        """Test a cancelled probe lets the next call probe."""
+        breaker = CircuitBreaker(min_calls=1, cooldown=0.02)
+
+        @breaker
+        async def call(ok):
+            if not ok:
+                raise ValueError("down")
+            await asyncio.sleep(10)
+
+        with pytest.raises(ValueError):
+            await call(False)
+        await asyncio.sleep(0.03)
+
+        probe = asyncio.create_task(call(True))
+        await asyncio.sleep(0)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+
+        assert breaker.state == "half_open"
+        with pytest.raises(ValueError):
+            await call(False)
+        assert breaker.state == "open"
+
+    def test_invalid_options(self):
+        """Test invalid options raise ValueError."""
+        with pytest.raises(ValueError):
+            CircuitBreaker(failure_threshold=0)
+        with pytest.raises(ValueError):
+            CircuitBreaker(min_calls=0)
+
+
+class TestLatencyHistogram:
+    """Test LatencyHistogram."""
+
+    def test_percentiles_within_precision(self):
+        """Test percentiles are within the bucket precision."""
+        histogram = LatencyHistogram(precision=4)
+        values = list(range(1, 100_001))
+        for value in values:
+            histogram.record(value * 1000)
+
+        assert histogram.count == len(values)
+        for q in (50, 90, 99):
+            exact = values[int(len(values) * q / 100) - 1] * 1000
+            assert exact <= histogram.percentile(q) <= exact * (1 + 1 / 16)
+        assert histogram.mean() == pytest.approx(50_000_500)
+
+    def test_small_values_exact(self):
+        """Test values below the first log bucket are counted exactly."""
+        histogram = LatencyHistogram(precision=4)
+        for value in (0, 3, 17, 31):
+            histogram.record(value)
+        assert histogram.min == 0
+        assert histogram.max == 31
+        assert histogram.percentile(50) == 3
+
+    def test_clamps_out_of_range(self):
+        """Test negative and huge values are clamped."""
+        histogram = LatencyHistogram(max_value=1 << 20)
+        histogram.record(-5)
+        histogram.record(1 << 30)
+        assert histogram.min == 0
+        assert histogram.max == 1 << 20
+
+    def test_merge_and_round_trip(self):
+        """Test merging and exporting through JSON."""
+        first = LatencyHistogram()
+        second = LatencyHistogram()
+        for value in range(1000):
+            first.record(value)
+            second.record(value + 1000)
+
+        data = json.loads(json.dumps(second.to_dict()))
+        merged = first.merge(LatencyHistogram.from_dict(data))
+        assert merged.count == 2000
+        assert merged.total == sum(range(2000))
+
+        with pytest.raises(ValueError, match="layouts"):
+            first.merge(LatencyHistogram(precision=3))
+
+
+class TestProfiled:
+    """Test profiled decorator."""
+
+    def test_counts_calls_and_errors(self):
+        """Test calls, errors and latency are recorded."""
+        registry = ProfileRegistry()
+
+        @profiled(registry=registry, name="work")
+        def work(fail=False):
+            if fail:
+                raise ValueError("boom")
+            return "ok"
+
+        assert work() == "ok"
+        with pytest.raises(ValueError):
+            work(fail=True)
+
+        (stats,) = registry.snapshot()
+        assert stats["name"] == "work"
+        assert stats["calls"] == 2
+        assert stats["errors"] == 1
+        assert stats["p99_ns"] >= stats["p50_ns"] > 0
+
+    def test_threads_are_merged(self):
+        """Test calls from several threads are all counted."""
+        registry = ProfileRegistry()
+
+        @profiled(registry=registry)
+        def work():
+            return None
+
+        def worker():
+            for _ in range(1000):
+                work()
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        work()
+
+        assert work.profile.calls == 4001
+        registry.reset()
+        assert work.profile.calls == 0
+        work()
+        assert work.profile.calls == 1
+
+    def test_finished_thread_shards_are_folded(self):
+        """Test shards of finished threads are folded as new ones appear."""
+        profile = FunctionProfile("work", max_value=1 << 20)
+
+        for _ in range(3):
+            thread = threading.Thread(target=profile.record, args=(1000,))
+            thread.start()
+            thread.join()
+
+        assert len(profile._shards) == 1
+        assert profile.calls == 3
+        assert profile.histogram.max_value == 1 << 20
+
+    @pytest.mark.asyncio
+    async def test_async(self):
+        """Test coroutines are timed until they finish."""
+        registry = ProfileRegistry()
+
+        @profiled(registry=registry)
+        async def work():
+            await asyncio.sleep(0.01)
+
+        await work()
+        assert work.profile.calls == 1
+        assert work.profile.histogram.max >= 10_000_000
+
+    def test_export(self):
+        """Test JSON, Prometheus export and merging snapshots."""
+        registry = ProfileRegistry()
+
+        @profiled(registry=registry, name='say "hi"')
+        def work():
+            return None
+
+        work()
+        snapshot = json.loads(registry.to_json())
+
+        other = ProfileRegistry()
+        other.merge(snapshot)
+        other.merge(snapshot)
+        assert other.snapshot()[0]["calls"] == 2
+
+        text = registry.to_prometheus()
+        assert "# TYPE pyutils_function_latency_seconds summary" in text
+        assert (
+            'pyutils_function_latency_seconds_count{function="say \\"hi\\""} 1' in text
+        )
+        assert 'pyutils_function_errors_total{function="say \\"hi\\""} 0' in text